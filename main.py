@@ -1,9 +1,9 @@
 import asyncio
 import hashlib
 import io
-import json
 import logging
 import os
+import random
 import re
 import secrets
 import uuid
@@ -15,7 +15,7 @@ from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request, W
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, Field, EmailStr, validator
@@ -24,6 +24,8 @@ from slowapi.errors import RateLimitExceeded
 from celery import Celery
 from prometheus_fastapi_instrumentator import Instrumentator
 import aiohttp
+import orjson
+from cachetools import TTLCache
 from config import settings
 
 # Logging Configuration with Correlation IDs
@@ -54,6 +56,9 @@ logger = logging.getLogger(__name__)
 def get_correlation_id(request: Request = None):
     return request.headers.get('X-Correlation-ID', str(uuid.uuid4())) if request else str(uuid.uuid4())
 
+def to_isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
 # Celery Configuration
 try:
     celery = Celery('quickhire', broker=settings.redis_url, backend=settings.redis_url)
@@ -159,6 +164,7 @@ async def lifespan(app: FastAPI):
     logger.info("Starting QuickHire AI application...")
     services = ServiceContainer()
     app.state.services = services
+    app.state.bg_tasks = set()
     try:
         await services.initialize()
         await services.ai_service.warmup()
@@ -168,6 +174,8 @@ async def lifespan(app: FastAPI):
         logger.error(f"Lifespan error: {str(e)}")
         raise
     finally:
+        if app.state.bg_tasks:
+            await asyncio.gather(*app.state.bg_tasks, return_exceptions=True)
         await services.cleanup()
         logger.info("All services shut down successfully")
 
@@ -176,6 +184,7 @@ app = FastAPI(
     description="AI-powered resume and cover letter generator",
     version="2.2.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {"name": "health", "description": "Health checks and system status"},
         {"name": "generation", "description": "Document generation operations"},
@@ -187,9 +196,27 @@ app = FastAPI(
     ]
 )
 
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that passes server-sent event streams through untouched.
+    Starlette's gzip responder buffers a streaming body and never flushes
+    per event, so a gzip-accepting browser would see nothing until the
+    stream closed.
+    """
+
+    def __init__(self, app, skip_prefixes=("/api/v1/sse/",), **kwargs):
+        super().__init__(app, **kwargs)
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 # Middleware Configuration
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts)
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1000)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -212,6 +239,16 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 security = HTTPBearer()
 
+BATCH_MINUTES_PER_REQUEST = 2
+TRACEBACK_SAMPLE_RATE = 0.1
+
+# In-process L1 cache in front of the shared cache service (L2) for template
+# payloads, which are read-only and identical for every user.
+TEMPLATES_L1 = TTLCache(maxsize=1024, ttl=900)
+
+def cached_json_response(body: bytes, source: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache-Source": source})
+
 def user_rate_limit(limit: str):
     async def get_user_id(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security), services: ServiceContainer = Depends(get_services)):
         try:
@@ -346,10 +383,10 @@ async def get_current_user(
         cached_user = await services.cache_service.get(cache_key)
         if cached_user:
             logger.info(f"User retrieved from cache - Correlation-ID: {correlation_id}")
-            return json.loads(cached_user)
+            return orjson.loads(cached_user)
 
         user = await services.auth_service.verify_token(credentials.credentials)
-        await services.cache_service.set(cache_key, json.dumps(user), ttl=300)
+        await services.cache_service.set(cache_key, orjson.dumps(user), ttl=300)
         logger.info(f"User authenticated - User: {user.get('user_id')} - Correlation-ID: {correlation_id}")
         return user
     except Exception as e:
@@ -361,6 +398,22 @@ async def get_current_user(
         )
 
 # Background Tasks
+def _background_task_done(task: asyncio.Task):
+    app.state.bg_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background cache update failed: {str(task.exception())}")
+
+def fire_and_forget(coro):
+    """
+    Run a cache mutation without making the client wait for it. Only for
+    writes whose loss or delay is harmless; security-relevant invalidations
+    (revocations) must be awaited.
+    """
+    task = asyncio.create_task(coro)
+    app.state.bg_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+    return task
+
 async def cleanup_old_files(user_id: str, services: ServiceContainer):
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=30)
@@ -463,7 +516,7 @@ async def generate_document(
         )
 
         await services.db_service.update_request_status(request_id, "completed")
-        await services.cache_service.set(f"generated_file:{request_id}", file_url, ttl=3600)
+        fire_and_forget(services.cache_service.set(f"generated_file:{request_id}", file_url, ttl=3600))
         return file_url
     except asyncio.TimeoutError:
         await services.db_service.update_request_status(request_id, "failed", "AI service timeout")
@@ -619,7 +672,7 @@ async def get_generation_history(
         cached_history = await services.cache_service.get(cache_key)
         if cached_history:
             logger.info(f"History retrieved from cache - User: {current_user['user_id']} - Correlation-ID: {correlation_id}")
-            return json.loads(cached_history)
+            return cached_json_response(cached_history, "L2")
 
         history = await services.db_service.get_user_generation_history(
             user_id=current_user['user_id'],
@@ -642,7 +695,7 @@ async def get_generation_history(
             "has_more": offset + len(history) < total_count
         }
 
-        await services.cache_service.set(cache_key, json.dumps(result, default=str), ttl=300)
+        await services.cache_service.set(cache_key, orjson.dumps(result, default=str), ttl=300)
         logger.info(f"History retrieved - User: {current_user['user_id']} - Correlation-ID: {correlation_id}")
         return result
     except Exception as e:
@@ -667,7 +720,7 @@ async def get_request_status(
         cache_key = f"request_status:{request_id}"
         cached_status = await services.cache_service.get(cache_key)
         if cached_status:
-            status_data = json.loads(cached_status)
+            status_data = orjson.loads(cached_status)
             if status_data['user_id'] == current_user['user_id']:
                 logger.info(f"Status retrieved from cache - Request: {request_id} - Correlation-ID: {correlation_id}")
                 return status_data
@@ -680,8 +733,8 @@ async def get_request_status(
             "request_id": request_id,
             "status": request_data['status'],
             "request_type": request_data['request_type'],
-            "created_at": request_data['created_at'],
-            "updated_at": request_data['updated_at'],
+            "created_at": to_isoformat(request_data['created_at']),
+            "updated_at": to_isoformat(request_data['updated_at']),
             "progress": request_data.get('progress', 0),
             "error_message": request_data.get('error_message'),
             "user_id": request_data['user_id']
@@ -689,7 +742,7 @@ async def get_request_status(
         if request_data['status'] == 'completed':
             status_response['download_url'] = f"/api/v1/download/{request_id}"
 
-        await services.cache_service.set(cache_key, json.dumps(status_response, default=str), ttl=60)
+        await services.cache_service.set(cache_key, orjson.dumps(status_response), ttl=60)
         logger.info(f"Status retrieved - Request: {request_id} - Correlation-ID: {correlation_id}")
         return status_response
     except HTTPException:
@@ -698,6 +751,9 @@ async def get_request_status(
         logger.error(f"Failed to get status for request {request_id}: {str(e)} - Correlation-ID: {correlation_id}")
         raise HTTPException(status_code=500, detail="Failed to retrieve request status")
 
+async def send_ws_json(websocket: WebSocket, data: dict):
+    await websocket.send_text(orjson.dumps(data).decode())
+
 @app.websocket("/api/v1/ws/status/{request_id}")
 async def websocket_status(
     websocket: WebSocket,
@@ -710,19 +766,19 @@ async def websocket_status(
         try:
             uuid.UUID(request_id)
         except ValueError:
-            await websocket.send_json({"error": "Invalid request ID format"})
+            await send_ws_json(websocket, {"error": "Invalid request ID format"})
             await websocket.close()
             return
 
         request_data = await services.db_service.get_generation_request(request_id)
         if not request_data or request_data['user_id'] != current_user['user_id']:
-            await websocket.send_json({"error": "Request not found or access denied"})
+            await send_ws_json(websocket, {"error": "Request not found or access denied"})
             await websocket.close()
             return
 
         while True:
             request_data = await services.db_service.get_generation_request(request_id)
-            await websocket.send_json({
+            await send_ws_json(websocket, {
                 "request_id": request_id,
                 "status": request_data['status'],
                 "progress": request_data.get('progress', 0),
@@ -733,10 +789,53 @@ async def websocket_status(
             await asyncio.sleep(5)
     except Exception as e:
         logger.error(f"WebSocket error for request {request_id}: {str(e)}")
-        await websocket.send_json({"error": "WebSocket error"})
+        await send_ws_json(websocket, {"error": "WebSocket error"})
     finally:
         await websocket.close()
 
+@app.get("/api/v1/sse/status/{request_id}", tags=["generation"])
+@user_rate_limit("30/minute")
+async def sse_status(
+    request_id: str,
+    current_user: dict = Depends(get_current_user),
+    services: ServiceContainer = Depends(get_services),
+    request: Request = None
+):
+    correlation_id = get_correlation_id(request)
+    try:
+        uuid.UUID(request_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request ID format")
+
+    request_data = await services.db_service.get_generation_request(request_id)
+    if not request_data or request_data['user_id'] != current_user['user_id']:
+        raise HTTPException(status_code=404, detail="Request not found or access denied")
+
+    async def event_gen():
+        data = request_data
+        try:
+            while True:
+                payload = {
+                    "request_id": request_id,
+                    "status": data['status'],
+                    "progress": data.get('progress', 0),
+                    "download_url": f"/api/v1/download/{request_id}" if data['status'] == 'completed' else None
+                }
+                yield b"data: " + orjson.dumps(payload) + b"\n\n"
+                if data['status'] in ['completed', 'failed'] or await request.is_disconnected():
+                    break
+                await asyncio.sleep(5)
+                data = await services.db_service.get_generation_request(request_id)
+        except Exception as e:
+            logger.error(f"SSE error for request {request_id}: {str(e)} - Correlation-ID: {correlation_id}")
+            yield b'event: error\ndata: {"error":"SSE error"}\n\n'
+
+    return StreamingResponse(
+        event_gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/v1/user/preferences", response_model=UserPreferences, tags=["user"])
 @user_rate_limit("10/minute")
 async def get_user_preferences(
@@ -766,7 +865,7 @@ async def update_user_preferences(
             current_user['user_id'],
             preferences.dict()
         )
-        await services.cache_service.delete(f"user_preferences:{current_user['user_id']}")
+        fire_and_forget(services.cache_service.delete(f"user_preferences:{current_user['user_id']}"))
         logger.info(f"Updated preferences for user {current_user['user_id']} - Correlation-ID: {correlation_id}")
         return UserPreferences(**updated_preferences)
     except Exception as e:
@@ -790,7 +889,8 @@ async def create_api_key(
 
         api_key = f"qh_{secrets.token_urlsafe(32)}"
         key_id = str(uuid.uuid4())
-        expires_at = datetime.utcnow() + timedelta(days=expires_in_days) if expires_in_days else None
+        now = datetime.utcnow()
+        expires_at = now + timedelta(days=expires_in_days) if expires_in_days else None
 
         await services.db_service.create_api_key(
             user_id=current_user['user_id'],
@@ -804,7 +904,7 @@ async def create_api_key(
         return APIKeyResponse(
             api_key=api_key,
             key_id=key_id,
-            created_at=datetime.utcnow().isoformat(),
+            created_at=now.isoformat(),
             expires_at=expires_at.isoformat() if expires_at else None
         )
     except HTTPException:
@@ -859,6 +959,7 @@ async def revoke_api_key(
         if not success:
             raise HTTPException(status_code=404, detail="API key not found")
 
+        # Awaited: a revoked key must stop authenticating before we report success
         await services.cache_service.delete_pattern(f"api_key:{key_id}:*")
         logger.info(f"Revoked API key {key_id} for user {current_user['user_id']} - Correlation-ID: {correlation_id}")
         return {"message": "API key revoked successfully"}
@@ -882,6 +983,7 @@ async def batch_generate(
         if len(batch_request.requests) > 10:
             raise HTTPException(status_code=400, detail="Maximum 10 requests per batch")
 
+        now = datetime.utcnow()
         batch_id = str(uuid.uuid4())
         request_ids = []
 
@@ -907,7 +1009,7 @@ async def batch_generate(
             "request_ids": request_ids,
             "status": "queued",
             "total_requests": len(request_ids),
-            "estimated_completion": (datetime.utcnow() + timedelta(minutes=len(request_ids) * 2)).isoformat()
+            "estimated_completion": (now + timedelta(minutes=len(request_ids) * BATCH_MINUTES_PER_REQUEST)).isoformat()
         }
     except HTTPException:
         raise
@@ -1012,10 +1114,10 @@ async def get_usage_analytics(
         cached_analytics = await services.cache_service.get(cache_key)
         if cached_analytics:
             logger.info(f"Analytics retrieved from cache - User: {current_user['user_id']} - Correlation-ID: {correlation_id}")
-            return json.loads(cached_analytics)
+            return cached_json_response(cached_analytics, "L2")
 
         analytics = await services.db_service.get_user_analytics(current_user['user_id'], days)
-        await services.cache_service.set(cache_key, json.dumps(analytics, default=str), ttl=3600)
+        await services.cache_service.set(cache_key, orjson.dumps(analytics, default=str), ttl=3600)
         logger.info(f"Analytics retrieved - User: {current_user['user_id']} - Correlation-ID: {correlation_id}")
         return analytics
     except HTTPException:
@@ -1024,7 +1126,7 @@ async def get_usage_analytics(
         logger.error(f"Failed to get analytics for user {current_user['user_id']}: {str(e)} - Correlation-ID: {correlation_id}")
         raise HTTPException(status_code=500, detail="Failed to retrieve usage analytics")
 
-@app.get("/api/v1/templates", response_model=List[TemplateResponse], tags=["templates"])
+@app.get("/api/v1/templates", tags=["templates"])
 @user_rate_limit("20/minute")
 async def get_available_templates(
     current_user: dict = Depends(get_current_user),
@@ -1033,16 +1135,25 @@ async def get_available_templates(
 ):
     correlation_id = get_correlation_id(request)
     try:
+        # Both cache tiers hold the serialized response body, so a hit is
+        # returned as-is without decoding, re-validating and re-encoding.
         cache_key = "templates:all"
+        cached_templates = TEMPLATES_L1.get(cache_key)
+        if cached_templates is not None:
+            return cached_json_response(cached_templates, "L1")
+
         cached_templates = await services.cache_service.get(cache_key)
         if cached_templates:
+            TEMPLATES_L1[cache_key] = cached_templates
             logger.info(f"Templates retrieved from cache - Correlation-ID: {correlation_id}")
-            return json.loads(cached_templates)
+            return cached_json_response(cached_templates, "L2")
 
         templates = await services.db_service.get_available_templates()
-        await services.cache_service.set(cache_key, json.dumps(templates, default=str), ttl=86400)
+        body = orjson.dumps([TemplateResponse(**t).dict() for t in templates])
+        await services.cache_service.set(cache_key, body, ttl=86400)
+        TEMPLATES_L1[cache_key] = body
         logger.info(f"Templates retrieved - Correlation-ID: {correlation_id}")
-        return templates
+        return cached_json_response(body, "DB")
     except Exception as e:
         logger.error(f"Failed to retrieve templates: {str(e)} - Correlation-ID: {correlation_id}")
         raise HTTPException(status_code=500, detail="Failed to retrieve templates")
@@ -1058,18 +1169,27 @@ async def get_template_preview(
     correlation_id = get_correlation_id(request)
     try:
         cache_key = f"template_preview:{template_id}"
+        cached_preview = TEMPLATES_L1.get(cache_key)
+        if cached_preview is not None:
+            return cached_json_response(cached_preview, "L1")
+
         cached_preview = await services.cache_service.get(cache_key)
         if cached_preview:
+            TEMPLATES_L1[cache_key] = cached_preview
             logger.info(f"Template preview retrieved from cache - Template: {template_id} - Correlation-ID: {correlation_id}")
-            return json.loads(cached_preview)
+            return cached_json_response(cached_preview, "L2")
 
         preview = await services.db_service.get_template_preview(template_id)
         if not preview:
             raise HTTPException(status_code=404, detail="Template not found")
 
-        await services.cache_service.set(cache_key, json.dumps(preview, default=str), ttl=86400)
+        # Validate and filter through the response model before caching, as the
+        # cached body is returned directly and bypasses response_model
+        body = orjson.dumps(TemplateResponse(**preview).dict())
+        await services.cache_service.set(cache_key, body, ttl=86400)
+        TEMPLATES_L1[cache_key] = body
         logger.info(f"Template preview retrieved - Template: {template_id} - Correlation-ID: {correlation_id}")
-        return preview
+        return cached_json_response(body, "DB")
     except HTTPException:
         raise
     except Exception as e:
@@ -1081,7 +1201,7 @@ async def get_template_preview(
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     correlation_id = get_correlation_id(request)
     logger.warning(f"Validation error from {request.client.host}: {exc} - Correlation-ID: {correlation_id}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation Error",
@@ -1094,7 +1214,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     correlation_id = get_correlation_id(request)
     logger.warning(f"Rate limit exceeded from {request.client.host}: {exc} - Correlation-ID: {correlation_id}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
         content={
             "error": "Rate Limit Exceeded",
@@ -1106,9 +1226,14 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
 @app.exception_handler(Exception)
 async def internal_server_error_handler(request: Request, exc):
     correlation_id = get_correlation_id(request)
-    error_id = str(uuid.uuid4())
-    logger.error(f"Internal server error {error_id}: {exc} - Correlation-ID: {correlation_id}", exc_info=True)
-    return JSONResponse(
+    error_id = secrets.token_hex(8)
+    # Rendering a traceback is expensive; only a sample of errors pays for it
+    # so a cheap-to-trigger exception cannot be used to amplify load.
+    if random.random() < TRACEBACK_SAMPLE_RATE:
+        logger.error("Internal server error %s: %s - Correlation-ID: %s", error_id, exc, correlation_id, exc_info=True)
+    else:
+        logger.error("Internal server error %s: %s: %s - Correlation-ID: %s", error_id, type(exc).__name__, exc, correlation_id)
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -1118,14 +1243,18 @@ async def internal_server_error_handler(request: Request, exc):
     )
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
     try:
+        # In production prefer `gunicorn -k uvicorn.workers.UvicornWorker -w 4 main:app`;
+        # WEB_CONCURRENCY is also read by the database pool sizing.
         uvicorn.run(
             "main:app",
             host=settings.api_host,
             port=settings.api_port,
             reload=settings.environment == "development",
-            workers=4,
+            workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+            loop="auto" if sys.platform == "win32" else "uvloop",
             http="httptools",
             log_config=None
         )
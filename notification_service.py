@@ -1,11 +1,118 @@
 import asyncio
+import atexit
+import base64
+import hashlib
+import queue
 import smtplib
 import logging
+import logging.handlers
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any, Optional, Union
+from email.message import Message
+from email.policy import compat32
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from datetime import datetime
-import copy
+from functools import lru_cache
+
+# Natively async SMTP client; without it sessions fall back to blocking
+# smtplib calls on a small dedicated thread pool.
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+# Messages are serialized once with a placeholder recipient and CRLF line
+# endings, so the bytes can go to SMTP as-is after swapping in the To header.
+_SMTP_POLICY = compat32.clone(linesep='\r\n')
+_TO_PLACEHOLDER = '__QUICKHIRE_TO__'
+_TO_PLACEHOLDER_HEADER = f'To: {_TO_PLACEHOLDER}'.encode('ascii')
+
+# Errors meaning the server hung up; the send is retried once on a new session
+_DISCONNECT_ERRORS: Tuple[type, ...] = (smtplib.SMTPServerDisconnected, ConnectionError)
+if aiosmtplib is not None:
+    _DISCONNECT_ERRORS += (aiosmtplib.SMTPServerDisconnected,)
+
+
+# --- Cached template bodies ---
+# Each returns the text before and after the timestamp, so repeated renders of
+# the same job/status pair only pay for formatting the current time.
+
+@lru_cache(maxsize=512)
+def _job_application_parts(job_title: str, applicant_name: str) -> Tuple[str, str]:
+    return (
+        f"Dear Employer,\n\n"
+        f"You have received a new application for the position: {job_title}\n\n"
+        f"Applicant: {applicant_name}\n"
+        f"Application Date: ",
+        "\n\n"
+        "Please log in to your QuickHire dashboard to review the application.\n\n"
+        "Best regards,\nQuickHire Team"
+    )
+
+
+@lru_cache(maxsize=512)
+def _application_confirmation_parts(job_title: str, company_name: str) -> Tuple[str, str]:
+    return (
+        f"Dear Applicant,\n\n"
+        f"Thank you for applying to the position: {job_title} at {company_name}\n\n"
+        "Your application has been successfully submitted and is now under review.\n\n"
+        "Application Date: ",
+        "\n\n"
+        "You will be notified of any updates regarding your application status.\n\n"
+        "Best regards,\nQuickHire Team"
+    )
+
+
+@lru_cache(maxsize=512)
+def _status_update_parts(job_title: str, status: str, message: str) -> Tuple[str, str]:
+    return (
+        f"Dear Applicant,\n\n"
+        f"Your application status for {job_title} has been updated.\n\n"
+        f"New Status: {status}\n\n"
+        f"{message}\n\n"
+        "Date: ",
+        "\n\n"
+        "Best regards,\nQuickHire Team"
+    )
+
+
+def _short(data: Dict[str, Any], limit: int = 40) -> Dict[str, Any]:
+    """Copy of data with long string values truncated, for log output."""
+    return {
+        key: value[:limit] + '…' if isinstance(value, str) and len(value) > limit else value
+        for key, value in data.items()
+    }
+
+
+def _timestamp() -> str:
+    return f"{datetime.now():%Y-%m-%d %H:%M:%S}"
+
+
+class _NotificationQueue(asyncio.Queue):
+    """
+    asyncio.Queue holding at most `capacity` items. Once full, a new item
+    evicts the oldest one instead of blocking the producer.
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self.dropped = 0
+        super().__init__()
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = deque(maxlen=self._capacity)
+
+    def _put(self, item: Dict[str, Any]) -> None:
+        if len(self._queue) == self._capacity:
+            self.dropped += 1
+        self._queue.append(item)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self._queue)
+
 
 class NotificationService:
     """
@@ -13,21 +120,85 @@ class NotificationService:
     Features:
         - Async, queue-based, and bulk notification system
         - Configurable SMTP (and extensible for other channels)
+        - Pooled, reused SMTP sessions (no TLS/login handshake per email)
         - Complete logging, error handling, and queue inspection
         - HTML/plaintext support
         - Modern Python typing and idioms
     """
 
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    # Maximum number of messages sent back-to-back over one SMTP session
+    BATCH_SIZE = 32
+    # Queued notifications are delivered in micro-batches of up to BATCH_SIZE,
+    # waiting at most DRAIN_MAX_WAIT seconds for a batch to fill.
+    DRAIN_MAX_WAIT = 0.05
+    # Total size of base64-encoded attachment payloads kept for reuse
+    ATTACHMENT_CACHE_BYTES = 16 * 1024 * 1024
+    # Pooled sessions idle for longer than this are probed with NOOP before reuse
+    IDLE_CHECK_AFTER = 60.0
+    # Oldest queued notifications are dropped beyond this many
+    MAX_QUEUED = 100_000
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        *,
+        max_connections: int = 5,
+        max_messages_per_conn: int = 100
+    ):
         self.email_config: Dict[str, Union[str, int]] = {
             'smtp_server': 'smtp.gmail.com',
             'smtp_port': 587,
             'username': '',
             'password': '',
         }
-        self.notifications_queue: List[Dict[str, Any]] = []
+        self.notifications_queue = _NotificationQueue(self.MAX_QUEUED)
         self.logger = logger or self._default_logger()
-        self._lock = asyncio.Lock()
+        # Background consumer of notifications_queue, started on first use
+        self._drain_task: Optional[asyncio.Task] = None
+
+        # SMTP connection pool: idle, already-authenticated sessions are kept
+        # in _pool as (session, returned_at); _pool_slots caps how many exist
+        # at once. A session is recycled after max_messages_per_conn messages.
+        self.max_connections = max_connections
+        self.max_messages_per_conn = max_messages_per_conn
+        self._pool: asyncio.Queue = asyncio.Queue()
+        self._pool_slots = asyncio.Semaphore(max_connections)
+        self._conn_uses: Dict[Any, int] = {}
+
+        # Sends are handed to a fixed set of worker tasks through _send_q.
+        # With aiosmtplib each worker drives its session on the event loop;
+        # otherwise blocking SMTP I/O runs on max_connections dedicated
+        # threads instead of one default-executor thread per caller.
+        self._use_aiosmtplib = aiosmtplib is not None
+        self._smtp_executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='smtp')
+        self._send_q: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._workers_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Serialized attachment-free messages keyed by (subject, body, is_html).
+        # Messages with attachments are rebuilt each time; only their base64
+        # payloads are cached, in the byte-bounded _att_cache below.
+        self._build_msg_bytes = lru_cache(maxsize=256)(self._render_msg_bytes)
+        # Base64 attachment payloads keyed by a digest of the raw content
+        self._att_cache: 'OrderedDict[bytes, str]' = OrderedDict()
+        self._att_cache_bytes = 0
+
+        # Queued notification type -> (composer, recipient field, positional
+        # fields, optional fields). A new channel is one more entry here.
+        self._dispatch: Dict[str, Tuple[Any, str, Tuple[str, ...], Tuple[str, ...]]] = {
+            'job_application': (
+                self._compose_job_application, 'employer_email', ('job_title', 'applicant_name'), ()
+            ),
+            'application_confirmation': (
+                self._compose_application_confirmation, 'applicant_email', ('job_title', 'company_name'), ()
+            ),
+            'status_update': (
+                self._compose_status_update, 'applicant_email', ('job_title', 'status'), ('message',)
+            ),
+            'custom_email': (
+                self._compose_custom_email, 'to_email', ('subject', 'body'), ()
+            ),
+        }
 
     @staticmethod
     def _default_logger() -> logging.Logger:
@@ -36,7 +207,13 @@ class NotificationService:
             handler = logging.StreamHandler()
             formatter = logging.Formatter('[%(asctime)s] %(levelname)s | %(message)s')
             handler.setFormatter(formatter)
-            logger.addHandler(handler)
+            # Callers only enqueue records; timestamp formatting and the
+            # stream write happen on the listener's thread.
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
         logger.setLevel(logging.INFO)
         return logger
 
@@ -48,6 +225,8 @@ class NotificationService:
             'username': username,
             'password': password,
         })
+        # Cached messages embed the sender address
+        self._build_msg_bytes.cache_clear()
         self.logger.info("Email configuration updated.")
 
     async def send_email(
@@ -63,197 +242,677 @@ class NotificationService:
         Send an email notification (supports HTML and attachments).
         """
         try:
-            msg = MIMEMultipart()
-            msg['Subject'] = subject
-            msg['From'] = self.email_config['username']
-            msg['To'] = to_email
-
-            if is_html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
-
-            # Attach files if provided
-            if attachments:
-                from email.mime.base import MIMEBase
-                from email import encoders
-                for att in attachments:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(att['content'])
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename="{att["filename"]}"'
-                    )
-                    msg.attach(part)
-
-            # Async-friendly SMTP send
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._send_email_sync, msg, to_email)
-            self.logger.info(f"Email sent successfully to {to_email}")
+            msg = self._message_bytes(to_email, subject, body, is_html, attachments)
+
+            # Hand off to the SMTP workers and wait for the outcome
+            loop = asyncio.get_running_loop()
+            self._ensure_workers(loop)
+            fut = loop.create_future()
+            self._send_q.put_nowait((msg, to_email, fut))
+            await fut
+            self.logger.info("Email sent successfully to %s", to_email)
             return True
 
         except Exception as e:
-            self.logger.error(f"Failed to send email to {to_email}: {e}")
+            self.logger.error("Failed to send email to %s: %s", to_email, e)
             return False
 
-    def _send_email_sync(self, msg: MIMEMultipart, to_email: str):
+    async def send_email_multi(
+        self,
+        to_list: List[str],
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        *,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, bool]:
+        """
+        Send the same email to each recipient individually. The message is
+        serialized (and attachments encoded) once; only the To header differs.
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_workers(loop)
+        results = {to_email: False for to_email in to_list}
+        try:
+            template = self._message_template(subject, body, is_html, attachments)
+        except Exception as e:
+            self.logger.error("Failed to build email for %s: %s", to_list, e)
+            return results
+
+        futures = {}
+        for to_email in to_list:
+            try:
+                msg = self._address(template, to_email)
+            except Exception as e:
+                self.logger.error("Failed to send email to %s: %s", to_email, e)
+                continue
+            fut = loop.create_future()
+            self._send_q.put_nowait((msg, to_email, fut))
+            futures[to_email] = fut
+
+        outcomes = await asyncio.gather(*futures.values(), return_exceptions=True)
+        for to_email, outcome in zip(futures, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error("Failed to send email to %s: %s", to_email, outcome)
+            else:
+                results[to_email] = True
+                self.logger.info("Email sent successfully to %s", to_email)
+        return results
+
+    def _message_bytes(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> bytes:
+        """Serialized message for to_email, built from the shared cached rendering."""
+        return self._address(self._message_template(subject, body, is_html, attachments), to_email)
+
+    def _message_template(
+        self,
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> bytes:
+        """Serialized message with a placeholder To header; see _address."""
+        if attachments:
+            return self._render_msg_bytes(subject, body, is_html, attachments)
+        return self._build_msg_bytes(subject, body, is_html)
+
+    @staticmethod
+    def _address(template: bytes, to_email: str) -> bytes:
+        """Fill the placeholder To header of a serialized message."""
+        return template.replace(_TO_PLACEHOLDER_HEADER, f'To: {to_email}'.encode('ascii'), 1)
+
+    def _render_msg_bytes(
+        self,
+        subject: str,
+        body: str,
+        is_html: bool,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> bytes:
+        msg = self._build_message(_TO_PLACEHOLDER, subject, body, is_html, attachments)
+        return msg.as_bytes(policy=_SMTP_POLICY)
+
+    def _build_message(
+        self,
+        to_header: str,
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> Message:
+        text = MIMEText(body, 'html' if is_html else 'plain')
+        # Without attachments the text part is the whole message, so no
+        # multipart wrapper (and no extra boundary/header set) is generated.
+        msg = MIMEMultipart() if attachments else text
+        msg['Subject'] = subject
+        msg['From'] = self.email_config['username']
+        msg['To'] = to_header
+        if msg is text:
+            return msg
+
+        msg.attach(text)
+
+        # Attach files if provided
+        if attachments:
+            from email.mime.base import MIMEBase
+            for att in attachments:
+                part = MIMEBase('application', 'octet-stream')
+                part.set_payload(self._encoded_attachment(att['content']))
+                part['Content-Transfer-Encoding'] = 'base64'
+                part.add_header(
+                    'Content-Disposition',
+                    f'attachment; filename="{att["filename"]}"'
+                )
+                msg.attach(part)
+        return msg
+
+    def _encoded_attachment(self, content: Union[bytes, str]) -> str:
+        """Base64 payload for an attachment, encoded once per distinct content."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        key = hashlib.blake2b(content, digest_size=16).digest()
+        payload = self._att_cache.get(key)
+        if payload is not None:
+            self._att_cache.move_to_end(key)
+            return payload
+
+        payload = base64.encodebytes(content).decode('ascii')
+        if len(payload) <= self.ATTACHMENT_CACHE_BYTES:
+            self._att_cache[key] = payload
+            self._att_cache_bytes += len(payload)
+            while self._att_cache_bytes > self.ATTACHMENT_CACHE_BYTES:
+                _, evicted = self._att_cache.popitem(last=False)
+                self._att_cache_bytes -= len(evicted)
+        return payload
+
+    def _send_email_sync(self, server: smtplib.SMTP, msg: bytes, to_email: str):
         """Synchronous SMTP send, called in executor to not block event loop."""
-        with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
+        server.sendmail(
+            self.email_config['username'],
+            to_email,
+            msg
+        )
+
+    async def _deliver(self, server: Any, msg: bytes, to_email: str) -> None:
+        """Send one serialized message over a pooled session."""
+        if self._use_aiosmtplib:
+            await server.sendmail(self.email_config['username'], [to_email], msg)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._smtp_executor, self._send_email_sync, server, msg, to_email)
+
+    # --- Batched Sending ---
+
+    async def send_batch(self, messages: List[Tuple[List[str], bytes]]) -> List[Set[str]]:
+        """
+        Send several (recipients, serialized message) pairs over a single pooled SMTP session.
+        With smtplib, envelope commands are pipelined when the server
+        advertises PIPELINING. If the session turns out to be dead, the
+        unsent remainder is retried once on a verified session. Returns the
+        accepted recipients of each message (empty set on failure).
+        """
+        loop = asyncio.get_running_loop()
+        results: List[Set[str]] = []
+        for attempt in range(2):
+            try:
+                server = await self._get_conn(verify=attempt > 0)
+            except Exception as e:
+                if not attempt:
+                    raise
+                self.logger.error("Could not reopen SMTP session for batch retry: %s", e)
+                break
+            done: List[Set[str]] = []
+            lost = True
+            try:
+                if self._use_aiosmtplib:
+                    done, lost = await self._send_batch_async(server, messages)
+                else:
+                    done, lost = await loop.run_in_executor(
+                        self._smtp_executor, self._send_batch_sync, server, messages
+                    )
+            finally:
+                await self._put_conn(server, reusable=not lost, sent=len(done))
+            results.extend(done)
+            messages = messages[len(done):]
+            if not lost or not messages:
+                break
+            if not attempt:
+                self.logger.warning("SMTP session dropped during batch, retrying %d messages on a new connection", len(messages))
+        results.extend(set() for _ in messages)
+        return results
+
+    async def _send_batch_async(
+        self,
+        server: Any,
+        messages: List[Tuple[List[str], bytes]]
+    ) -> Tuple[List[Set[str]], bool]:
+        """aiosmtplib counterpart of _send_batch_sync."""
+        from_addr = self.email_config['username']
+        results: List[Set[str]] = []
+        for to_addrs, msg in messages:
+            try:
+                refused, _ = await server.sendmail(from_addr, to_addrs, msg)
+                results.append(set(to_addrs) - set(refused))
+            except (aiosmtplib.SMTPServerDisconnected, OSError) as e:
+                self.logger.error("SMTP session lost during batch: %s", e)
+                return results, True
+            except aiosmtplib.SMTPException as e:
+                self.logger.error("Failed to send batched email to %s: %s", to_addrs, e)
+                results.append(set())
+        return results, False
+
+    def _send_batch_sync(
+        self,
+        server: smtplib.SMTP,
+        messages: List[Tuple[List[str], bytes]]
+    ) -> Tuple[List[Set[str]], bool]:
+        """
+        Blocking batch send. Returns the accepted recipients of each message
+        attempted, and whether the session was lost; in that case the
+        messages after the returned results were not sent.
+        """
+        from_addr = self.email_config['username']
+        server.ehlo_or_helo_if_needed()
+        pipelining = server.has_extn('pipelining')
+        results: List[Set[str]] = []
+        for to_addrs, msg in messages:
+            try:
+                if pipelining:
+                    refused = self._pipelined_sendmail(server, from_addr, to_addrs, msg)
+                else:
+                    refused = server.sendmail(from_addr, to_addrs, msg)
+                results.append(set(to_addrs) - set(refused))
+            except smtplib.SMTPServerDisconnected as e:
+                self.logger.error("SMTP session lost during batch: %s", e)
+                return results, True
+            # SMTPException subclasses OSError; a refused message leaves the session usable
+            except smtplib.SMTPException as e:
+                self.logger.error("Failed to send batched email to %s: %s", to_addrs, e)
+                results.append(set())
+            except OSError as e:
+                self.logger.error("SMTP session lost during batch: %s", e)
+                return results, True
+        return results, False
+
+    @staticmethod
+    def _pipelined_sendmail(server: smtplib.SMTP, from_addr: str, to_addrs: List[str], msg: bytes) -> Dict[str, Tuple[int, bytes]]:
+        """
+        RFC 2920 transaction: MAIL FROM and every RCPT TO are written in one
+        send, their replies are then read in order, and DATA follows.
+        Mirrors SMTP.sendmail's return value and exceptions.
+        """
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"]
+        commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs]
+        server.send("".join(f"{cmd}\r\n" for cmd in commands))
+        replies = [server.getreply() for _ in commands]
+
+        code, resp = replies[0]
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+        refused = {addr: reply for addr, reply in zip(to_addrs, replies[1:]) if reply[0] not in (250, 251)}
+        if len(refused) == len(to_addrs):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, resp = server.data(msg)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    async def _send_grouped(self, items: List[Tuple[str, str, str, bool]]) -> List[bool]:
+        """
+        Send (to_email, subject, body, is_html) items. Items with identical
+        content become one multi-recipient message, and messages are sent
+        BATCH_SIZE at a time per SMTP session, with up to max_connections
+        sessions in flight. Returns a success flag per item.
+        """
+        buckets: Dict[Tuple[str, str, bool], List[int]] = {}
+        for i, (_, subject, body, is_html) in enumerate(items):
+            buckets.setdefault((subject, body, is_html), []).append(i)
+
+        messages = []
+        for (subject, body, is_html), indexes in buckets.items():
+            recipients = [items[i][0] for i in indexes]
+            to_header = recipients[0] if len(recipients) == 1 else 'undisclosed-recipients:;'
+            messages.append((indexes, recipients, self._message_bytes(to_header, subject, body, is_html)))
+
+        chunks = [messages[start:start + self.BATCH_SIZE] for start in range(0, len(messages), self.BATCH_SIZE)]
+        # Each batch borrows its own pooled session; _get_conn's pool slots
+        # bound how many are sent concurrently.
+        outcomes = await asyncio.gather(
+            *(self.send_batch([(recipients, msg) for _, recipients, msg in chunk]) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        results = [False] * len(items)
+        for chunk, accepted in zip(chunks, outcomes):
+            if isinstance(accepted, Exception):
+                self.logger.error("Batch send failed: %s", accepted)
+                continue
+            for (indexes, recipients, _), ok in zip(chunk, accepted):
+                for i, recipient in zip(indexes, recipients):
+                    results[i] = recipient in ok
+        return results
+
+    # --- SMTP Workers ---
+
+    def _ensure_workers(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the SMTP worker tasks on first use (or on a new event loop)."""
+        if self._workers_loop is loop and self._workers:
+            return
+        self._send_q = asyncio.Queue()
+        self._workers = [loop.create_task(self._smtp_worker()) for _ in range(self.max_connections)]
+        self._workers_loop = loop
+
+    async def _smtp_worker(self) -> None:
+        """Send queued messages one at a time over a pooled SMTP session."""
+        while True:
+            msg, to_email, fut = await self._send_q.get()
+            try:
+                if fut.cancelled():
+                    continue
+                await self._send_on_pool(msg, to_email)
+                if not fut.done():
+                    fut.set_result(True)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+            finally:
+                self._send_q.task_done()
+
+    async def _send_on_pool(self, msg: bytes, to_email: str) -> None:
+        """Send over a pooled session, retrying once on a fresh one if the server hung up."""
+        for attempt in range(2):
+            server = await self._get_conn()
+            sent = False
+            try:
+                await self._deliver(server, msg, to_email)
+                sent = True
+                return
+            except _DISCONNECT_ERRORS as e:
+                if attempt:
+                    raise
+                self.logger.warning("SMTP session dropped (%s), retrying on a new connection", e)
+            finally:
+                await self._put_conn(server, reusable=sent)
+
+    # --- SMTP Connection Pool ---
+
+    def _make_conn(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session (blocking)."""
+        server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
+        try:
             server.ehlo()
             server.starttls()
             server.login(self.email_config['username'], self.email_config['password'])
-            server.sendmail(
-                self.email_config['username'],
-                to_email,
-                msg.as_string()
-            )
+        except Exception:
+            server.close()
+            raise
+        return server
 
-    # --- Notification Templates ---
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
 
     @staticmethod
-    def _template_job_application(job_title: str, applicant_name: str) -> str:
-        return (
-            f"Dear Employer,\n\n"
-            f"You have received a new application for the position: {job_title}\n\n"
-            f"Applicant: {applicant_name}\n"
-            f"Application Date: {datetime.now():%Y-%m-%d %H:%M:%S}\n\n"
-            "Please log in to your QuickHire dashboard to review the application.\n\n"
-            "Best regards,\nQuickHire Team"
+    def _close_conn(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    async def _open_conn(self) -> Any:
+        """Open and authenticate a new SMTP session with the active transport."""
+        if not self._use_aiosmtplib:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._smtp_executor, self._make_conn)
+        server = aiosmtplib.SMTP(
+            hostname=self.email_config['smtp_server'],
+            port=self.email_config['smtp_port'],
+            use_tls=False,
+            start_tls=True
         )
+        await server.connect()
+        try:
+            await server.login(self.email_config['username'], self.email_config['password'])
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    async def _check_conn(self, server: Any) -> bool:
+        if not self._use_aiosmtplib:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._smtp_executor, self._is_alive, server)
+        try:
+            return (await server.noop()).code == 250
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _drop_conn(self, server: Any) -> None:
+        self._conn_uses.pop(server, None)
+        if not self._use_aiosmtplib:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._smtp_executor, self._close_conn, server)
+            return
+        try:
+            await server.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            server.close()
+
+    async def _get_conn(self, verify: bool = False) -> Any:
+        """
+        Borrow a live SMTP session from the pool, opening one if needed.
+        With verify, every pooled session is NOOP-checked regardless of age.
+        """
+        await self._pool_slots.acquire()
+        try:
+            while not self._pool.empty():
+                server, returned_at = self._pool.get_nowait()
+                # Recently used sessions are handed out as-is; a dead one is
+                # caught by the caller's disconnect handling instead.
+                recent = not verify and time.monotonic() - returned_at < self.IDLE_CHECK_AFTER
+                if recent or await self._check_conn(server):
+                    return server
+                await self._drop_conn(server)
+            server = await self._open_conn()
+            self._conn_uses[server] = 0
+            return server
+        except Exception:
+            self._pool_slots.release()
+            raise
+
+    async def _put_conn(self, server: Any, reusable: bool = True, sent: int = 1) -> None:
+        """Return a borrowed session; broken or worn-out sessions are closed."""
+        try:
+            uses = self._conn_uses.get(server, 0) + sent
+            if reusable and uses < self.max_messages_per_conn:
+                self._conn_uses[server] = uses
+                self._pool.put_nowait((server, time.monotonic()))
+                return
+            await self._drop_conn(server)
+        finally:
+            self._pool_slots.release()
+
+    async def aclose(self) -> None:
+        """Stop the queue drain and SMTP workers and close all idle pooled sessions."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        while self._send_q is not None and not self._send_q.empty():
+            _, _, fut = self._send_q.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("NotificationService is closed"))
+        self._workers = []
+        self._workers_loop = None
+        while not self._pool.empty():
+            server, _ = self._pool.get_nowait()
+            await self._drop_conn(server)
+        self._smtp_executor.shutdown(wait=True)
+
+    # --- Notification Templates ---
 
     @staticmethod
-    def _template_application_confirmation(job_title: str, company_name: str) -> str:
-        return (
-            f"Dear Applicant,\n\n"
-            f"Thank you for applying to the position: {job_title} at {company_name}\n\n"
-            "Your application has been successfully submitted and is now under review.\n\n"
-            f"Application Date: {datetime.now():%Y-%m-%d %H:%M:%S}\n\n"
-            "You will be notified of any updates regarding your application status.\n\n"
-            "Best regards,\nQuickHire Team"
-        )
+    def _template_job_application(job_title: str, applicant_name: str, ts: Optional[str] = None) -> str:
+        head, tail = _job_application_parts(job_title, applicant_name)
+        return f"{head}{ts or _timestamp()}{tail}"
 
     @staticmethod
-    def _template_status_update(job_title: str, status: str, message: str = "") -> str:
-        return (
-            f"Dear Applicant,\n\n"
-            f"Your application status for {job_title} has been updated.\n\n"
-            f"New Status: {status}\n\n"
-            f"{message}\n\n"
-            f"Date: {datetime.now():%Y-%m-%d %H:%M:%S}\n\n"
-            "Best regards,\nQuickHire Team"
-        )
+    def _template_application_confirmation(job_title: str, company_name: str, ts: Optional[str] = None) -> str:
+        head, tail = _application_confirmation_parts(job_title, company_name)
+        return f"{head}{ts or _timestamp()}{tail}"
+
+    @staticmethod
+    def _template_status_update(job_title: str, status: str, message: str = "", ts: Optional[str] = None) -> str:
+        head, tail = _status_update_parts(job_title, status, message)
+        return f"{head}{ts or _timestamp()}{tail}"
+
+    # --- Notification Composers (subject, body) ---
+
+    def _compose_job_application(self, job_title: str, applicant_name: str, ts: Optional[str] = None) -> Tuple[str, str]:
+        return f"New Application for {job_title}", self._template_job_application(job_title, applicant_name, ts)
+
+    def _compose_application_confirmation(self, job_title: str, company_name: str, ts: Optional[str] = None) -> Tuple[str, str]:
+        return f"Application Confirmation - {job_title}", self._template_application_confirmation(job_title, company_name, ts)
+
+    def _compose_status_update(self, job_title: str, status: str, message: str = "", ts: Optional[str] = None) -> Tuple[str, str]:
+        return f"Application Status Update - {job_title}", self._template_status_update(job_title, status, message, ts)
+
+    @staticmethod
+    def _compose_custom_email(subject: str, body: str, ts: Optional[str] = None) -> Tuple[str, str]:
+        return subject, body
 
     # --- Notification Senders ---
 
     async def send_job_application_notification(self, employer_email: str, job_title: str, applicant_name: str) -> bool:
         """Send notification to employer about new job application."""
-        subject = f"New Application for {job_title}"
-        body = self._template_job_application(job_title, applicant_name)
+        subject, body = self._compose_job_application(job_title, applicant_name)
         return await self.send_email(employer_email, subject, body)
 
     async def send_application_confirmation(self, applicant_email: str, job_title: str, company_name: str) -> bool:
         """Send confirmation to applicant."""
-        subject = f"Application Confirmation - {job_title}"
-        body = self._template_application_confirmation(job_title, company_name)
+        subject, body = self._compose_application_confirmation(job_title, company_name)
         return await self.send_email(applicant_email, subject, body)
 
     async def send_status_update(self, applicant_email: str, job_title: str, status: str, message: str = "") -> bool:
         """Send application status update."""
-        subject = f"Application Status Update - {job_title}"
-        body = self._template_status_update(job_title, status, message)
+        subject, body = self._compose_status_update(job_title, status, message)
         return await self.send_email(applicant_email, subject, body)
 
     # --- Queue System ---
 
     async def queue_notification(self, notification_data: Dict[str, Any]) -> None:
-        """Thread-safe add notification to queue for batch processing."""
-        async with self._lock:
-            notification_data = copy.deepcopy(notification_data)
-            notification_data['queued_at'] = datetime.now().isoformat()
-            self.notifications_queue.append(notification_data)
-            self.logger.debug(f"Notification queued: {notification_data}")
+        """Add a notification to the queue; it is delivered in the background."""
+        # Notifications are flat dicts of strings, so a shallow copy is enough
+        notification_data = {**notification_data, 'queued_at': datetime.now().isoformat()}
+        dropped = self.notifications_queue.dropped
+        self.notifications_queue.put_nowait(notification_data)
+        if self.notifications_queue.dropped != dropped:
+            self.logger.warning("Notification queue full, dropped the oldest entry")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Notification queued: %s", _short(notification_data))
+        self._ensure_drain()
+
+    def _ensure_drain(self) -> None:
+        """Start the background queue consumer on first use (or on a new event loop)."""
+        loop = asyncio.get_running_loop()
+        task = self._drain_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._drain_task = loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """Deliver queued notifications as they arrive, in micro-batches."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._deliver_notifications(batch)
+            except Exception as e:
+                self.logger.error("Error processing notification batch: %s", e)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for one notification, then gather up to BATCH_SIZE within DRAIN_MAX_WAIT."""
+        queue = self.notifications_queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.DRAIN_MAX_WAIT
+        while len(batch) < self.BATCH_SIZE:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _render_notification(
+        self,
+        notification: Dict[str, Any],
+        ts: Optional[str] = None
+    ) -> Optional[Tuple[str, str, str, bool]]:
+        """
+        Turn a queued notification into (to_email, subject, body, is_html); None if the type is unknown.
+        ts is the timestamp written into templated bodies (defaults to now).
+        """
+        entry = self._dispatch.get(notification.get('type'))
+        if entry is None:
+            return None
+        composer, to_field, fields, optional = entry
+        subject, body = composer(
+            *[notification[field] for field in fields],
+            ts=ts,
+            **{field: notification[field] for field in optional if field in notification}
+        )
+        return notification[to_field], subject, body, notification.get('is_html', False)
 
     async def process_notification_queue(self) -> Dict[str, int]:
-        """Process and send all queued notifications (thread-safe)."""
+        """Send everything currently queued right away instead of waiting for the background drain."""
+        pending = []
+        while not self.notifications_queue.empty():
+            pending.append(self.notifications_queue.get_nowait())
+        return await self._deliver_notifications(pending)
+
+    async def _deliver_notifications(self, pending: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Render and send a batch of queued notifications; returns sent/failed counts."""
         processed = 0
         failed = 0
-        async with self._lock:
-            queue_copy = self.notifications_queue.copy()
-            for notification in queue_copy:
-                try:
-                    notification_type = notification.get('type')
-                    if notification_type == 'job_application':
-                        success = await self.send_job_application_notification(
-                            notification['employer_email'],
-                            notification['job_title'],
-                            notification['applicant_name']
-                        )
-                    elif notification_type == 'application_confirmation':
-                        success = await self.send_application_confirmation(
-                            notification['applicant_email'],
-                            notification['job_title'],
-                            notification['company_name']
-                        )
-                    elif notification_type == 'status_update':
-                        success = await self.send_status_update(
-                            notification['applicant_email'],
-                            notification['job_title'],
-                            notification['status'],
-                            notification.get('message', '')
-                        )
-                    elif notification_type == 'custom_email':
-                        success = await self.send_email(
-                            notification['to_email'],
-                            notification['subject'],
-                            notification['body'],
-                            notification.get('is_html', False)
-                        )
-                    else:
-                        self.logger.warning(f"Unknown notification type: {notification_type}")
-                        success = False
-
-                    if success:
-                        processed += 1
-                        self.logger.info(f"Notification sent: {notification_type}")
-                    else:
-                        failed += 1
-                        self.logger.error(f"Notification failed: {notification_type}")
-
-                    self.notifications_queue.remove(notification)
-
-                except Exception as e:
-                    self.logger.error(f"Error processing notification: {e}")
+        # One wall-clock timestamp is used for the whole drain
+        ts = _timestamp()
+        rendered = []
+        for notification in pending:
+            try:
+                item = self._render_notification(notification, ts)
+                if item is None:
+                    self.logger.warning("Unknown notification type: %s", notification.get('type'))
+                    self.logger.error("Notification failed: %s", notification.get('type'))
                     failed += 1
+                    continue
+                rendered.append((notification, item))
+            except Exception as e:
+                # Malformed notifications would fail the same way on retry
+                self.logger.error("Error processing notification: %s", e)
+                failed += 1
+
+        # Identical messages share one multi-RCPT transaction and the
+        # rest are pipelined over as few SMTP sessions as possible.
+        outcomes = await self._send_grouped([item for _, item in rendered])
+        for (notification, _), success in zip(rendered, outcomes):
+            notification_type = notification.get('type')
+            if success:
+                processed += 1
+                self.logger.info("Notification sent: %s", notification_type)
+            else:
+                failed += 1
+                self.logger.error("Notification failed: %s", notification_type)
 
         return {'processed': processed, 'failed': failed}
 
     async def send_bulk_notifications(self, notifications: List[Dict[str, Any]]) -> Dict[str, int]:
         """Send multiple notifications; returns count of sent/failed."""
         results = {'sent': 0, 'failed': 0}
+        items = []
         for notification in notifications:
             try:
-                success = await self.send_email(
+                items.append((
                     notification['email'],
                     notification['subject'],
                     notification['body'],
                     notification.get('is_html', False)
-                )
-                if success:
-                    results['sent'] += 1
-                else:
-                    results['failed'] += 1
+                ))
             except Exception as e:
-                self.logger.error(f"Bulk notification error: {e}")
+                self.logger.error("Bulk notification error: %s", e)
+                results['failed'] += 1
+        for success in await self._send_grouped(items):
+            if success:
+                results['sent'] += 1
+            else:
                 results['failed'] += 1
         return results
 
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status and details."""
+        items = self.notifications_queue.snapshot()
         return {
-            'queue_length': len(self.notifications_queue),
-            'oldest_notification': self.notifications_queue[0]['queued_at'] if self.notifications_queue else None,
-            'queue_items': copy.deepcopy(self.notifications_queue)
+            'queue_length': len(items),
+            'oldest_notification': items[0]['queued_at'] if items else None,
+            'dropped': self.notifications_queue.dropped,
+            'queue_items': items
         }
 
     # --- EXTENSIBILITY: add more notification channels here (SMS, Slack, etc) ---
@@ -280,6 +939,7 @@ if __name__ == "__main__":
         })
         result = await service.process_notification_queue()
         print("Processed:", result)
+        await service.aclose()
 
     # Run the example only if executed directly
     try:
@@ -1,29 +1,425 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, List, Tuple, Union
+from enum import IntEnum
 from xhtml2pdf import pisa
+from functools import lru_cache
+from html import escape as _html_escape
 import io
+import os
+import orjson
+import hashlib
+import re
+import time
+import threading
+import queue
 import asyncio
 import logging
-from datetime import datetime
-import base64
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import binascii
 from pathlib import Path
+from cachetools import LRUCache
+
+# WeasyPrint lays out HTML/CSS natively and is much faster than xhtml2pdf, but
+# needs the system cairo/pango libraries, so it stays optional.
+try:
+    from weasyprint import HTML, CSS
+except ImportError:
+    HTML = CSS = None
 
 logger = logging.getLogger(__name__)
 
-class PDFGenerator:
+# "weasyprint" (used when installed) or "xhtml2pdf"
+PDF_BACKEND = os.getenv("PDF_BACKEND", "weasyprint")
+PDF_BACKENDS = ("weasyprint", "xhtml2pdf")
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Byte budget for the generated-PDF cache; 0 disables it
+PDF_CACHE_BYTES = int(os.getenv("PDF_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# {field} placeholders in the HTML templates; CSS rule braces never match
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+class ResumeStyle(IntEnum):
+    MODERN = 0
+    CLASSIC = 1
+    CREATIVE = 2
+    MINIMAL = 3
+
+class CoverLetterStyle(IntEnum):
+    PROFESSIONAL = 0
+    FRIENDLY = 1
+    ENTHUSIASTIC = 2
+    FORMAL = 3
+
+def _resume_style(style: Union[str, ResumeStyle]) -> ResumeStyle:
+    """Map a style name to ResumeStyle; unknown names fall back to MODERN"""
+    if isinstance(style, ResumeStyle):
+        return style
+    return ResumeStyle.__members__.get(str(style).upper(), ResumeStyle.MODERN)
+
+def _cover_letter_style(style: Union[str, CoverLetterStyle]) -> CoverLetterStyle:
+    """Map a style name to CoverLetterStyle; unknown names fall back to PROFESSIONAL"""
+    if isinstance(style, CoverLetterStyle):
+        return style
+    return CoverLetterStyle.__members__.get(str(style).upper(), CoverLetterStyle.PROFESSIONAL)
+
+def _template_style(template_type: str, style: Union[str, int]) -> Union[ResumeStyle, CoverLetterStyle]:
+    """Style enum for a template type; raises ValueError for an unknown type"""
+    if template_type == "resume":
+        return _resume_style(style)
+    if template_type == "cover_letter":
+        return _cover_letter_style(style)
+    raise ValueError(f"Unknown template type: {template_type}")
+
+# Rules every resume style starts from; each template only adds its overrides
+COMMON_RESUME_CSS = """
+            .container {
+                max-width: 100%;
+                margin: 0 auto;
+            }
+            
+            .section-title {
+                font-weight: bold;
+                text-transform: uppercase;
+                letter-spacing: 1px;
+            }
+            
+            .date-range {
+                font-size: 9pt;
+                color: #888;
+                float: right;
+            }
+"""
+
+# xhtml2pdf cannot paint gradients or shadows; flatten them at compile time
+_GRADIENT_RE = re.compile(r"linear-gradient\([^,)]+,\s*(#[0-9A-Fa-f]{3,6})[^)]*\)")
+_BOX_SHADOW_RE = re.compile(r"^[ \t]*box-shadow:[^;]*;\n", re.M)
+
+def _convert_template(template: str, base_css: str, flat: bool = False) -> str:
+    """
+    Inline the shared CSS and turn {field} placeholders into ${field} slots.
+    With flat, gradients become their first colour stop and box-shadows are dropped.
+    """
+    if flat:
+        template = _BOX_SHADOW_RE.sub("", _GRADIENT_RE.sub(r"\1", template))
+    template = template.replace("$", "$$")
+    template = template.replace("{base_css}", base_css.replace("$", "$$"))
+    template = template.replace("{common_resume_css}", COMMON_RESUME_CSS.replace("$", "$$"))
+    return _PLACEHOLDER_RE.sub(r"${\1}", template)
+
+# Top-level rules of a stylesheet; the base CSS has no nested blocks
+_CSS_RULE_RE = re.compile(r"[^{}]+\{[^{}]*\}\s*")
+_CSS_CLASS_RE = re.compile(r"\.([A-Za-z_][\w-]*)")
+_CLASS_ATTR_RE = re.compile(r'class="([^"]*)"')
+
+# Classes the resume section builders emit around the template markup
+_RESUME_SECTION_CLASSES = frozenset({
+    "section", "section-title", "no-break", "summary", "experience-item", "job-title",
+    "company", "date-range", "description", "education-item", "degree", "institution",
+    "skills-grid", "skill-category", "skill-list", "skill-item", "skills-list", "skills-simple"
+})
+
+def _markup_classes(markup: str) -> frozenset:
+    """Every class name referenced by a class="..." attribute in markup"""
+    return frozenset(name for attr in _CLASS_ATTR_RE.findall(markup) for name in attr.split())
+
+def _curate_css(css: str, used: frozenset) -> str:
+    """Drop rules whose selectors only name classes outside `used`"""
+    kept = []
+    for match in _CSS_RULE_RE.finditer(css):
+        classes = _CSS_CLASS_RE.findall(match.group(0).split("{", 1)[0])
+        if not classes or not used.isdisjoint(classes):
+            kept.append(match.group(0))
+    return "".join(kept)
+
+@lru_cache(maxsize=32)
+def _parsed_css(css: str):
+    """WeasyPrint stylesheet for css, parsed once per process and shared by every generator"""
+    return CSS(string=css)
+
+# ${field} slots and $$ escapes in a converted template
+_SLOT_RE = re.compile(r"\$(?:\{([A-Za-z_][A-Za-z0-9_]*)\}|\$)")
+
+class ChunkTemplate:
+    """
+    Converted template pre-split into literal text and field names, then
+    specialised into a generated render(**fields) function that is a single
+    join. Drop-in for string.Template.safe_substitute.
+    """
+    
+    def __init__(self, source: str):
+        literals = []
+        fields = []
+        text = []
+        pos = 0
+        for match in _SLOT_RE.finditer(source):
+            text.append(source[pos:match.start()])
+            pos = match.end()
+            if match.group(1) is None:
+                text.append("$")
+            else:
+                literals.append("".join(text))
+                fields.append(match.group(1))
+                text = []
+        text.append(source[pos:])
+        literals.append("".join(text))
+        self.head = literals[0]
+        # (field, literal following it)
+        self.chunks = tuple(zip(fields, literals[1:]))
+        self.render = self._codegen()
+    
+    def _codegen(self):
+        """
+        Generate render() with one keyword argument per field and the literals
+        inlined. A field that isn't passed keeps its ${field} slot, as with
+        safe_substitute; unknown keywords are ignored.
+        """
+        names = sorted({field for field, _ in self.chunks})
+        params = ["*", *(f"{name}={'${' + name + '}'!r}" for name in names), "**_"] if names else ["**_"]
+        parts = [repr(self.head)]
+        for field, literal in self.chunks:
+            parts.append(f"str({field})")
+            if literal:
+                parts.append(repr(literal))
+        namespace: Dict[str, Any] = {}
+        exec(f"def render({', '.join(params)}):\n    return ''.join(({', '.join(parts)},))\n", namespace)
+        return namespace["render"]
+    
+    def safe_substitute(self, mapping: Optional[Dict[str, Any]] = None, **kws) -> str:
+        return self.render(**({**mapping, **kws} if mapping else kws))
+
+def _compile_template(template: str, base_css: str, flat: bool = False) -> ChunkTemplate:
+    """
+    Compiled form of template. Not persisted across processes: nearly all of
+    the cost is compiling the generated render(), and the only way to store
+    that is marshalled bytecode, which would execute whatever is on disk.
+    """
+    return ChunkTemplate(_convert_template(template, base_css, flat))
+
+def _walk_escape(obj: Any) -> Any:
+    """
+    HTML-escape every string in a content tree (dict keys included, since
+    skill categories are rendered). Values only ever land in text nodes.
+    """
+    if isinstance(obj, str):
+        return _html_escape(obj, quote=False)
+    if isinstance(obj, dict):
+        return {_walk_escape(key): _walk_escape(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_walk_escape(item) for item in obj]
+    return obj
+
+def _as_list(value: Any) -> list:
+    """value as a list of entries; a lone string becomes a single entry"""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value] if value else []
+
+def _normalize_experience(experiences: list) -> list:
+    """Experience entries with every description coerced to a list of bullets"""
+    return [{**exp, 'description': _as_list(exp.get('description'))} for exp in experiences or []]
+
+def _normalize_skills(skills: dict) -> Dict[str, list]:
+    """Skill groups with every value coerced to a list"""
+    return {category: _as_list(skill_list) for category, skill_list in (skills or {}).items()}
+
+# Display fragments take few distinct values across a batch, so they are
+# cached on the raw value and the same string object is reused.
+@lru_cache(maxsize=2048)
+def _fmt_contact(value: str) -> str:
+    """Contact line entry (phone, address, linkedin, github); empty when unset"""
+    return f"<span>{value}</span>" if value else ""
+
+@lru_cache(maxsize=2048)
+def _fmt_hiring_manager(hiring_manager: str) -> str:
+    return f"{hiring_manager}<br>" if hiring_manager else "Hiring Manager<br>"
+
+# Skills markup per resume style: (opening, one category, closing)
+_SKILLS_LAYOUTS = {
+    ResumeStyle.MODERN: ('<div class="skills-grid">', """
+                <div class="skill-category">
+                    <h4>{category}</h4>
+                    <div class="skill-list">{skills}</div>
+                </div>
+                """, '</div>'),
+    ResumeStyle.CLASSIC: ('<div class="skills-list">', "<strong>{category}:</strong> {skills}<br>", '</div>'),
+    ResumeStyle.CREATIVE: ("", """
+                <div class="section-title">{category}</div>
+                <div class="skill-item">{skills}</div>
+                """, ""),
+    ResumeStyle.MINIMAL: ('<div class="skills-simple">', "<strong>{category}:</strong> {skills}<br>", '</div>')
+}
+
+@lru_cache(maxsize=256)
+def _default_paragraphs(company_name: str, position: str) -> Tuple[str, ...]:
+    """Stock cover letter body, used when no paragraphs are supplied"""
+    return (
+        f"I am writing to express my strong interest in the {position} position at {company_name}. With my background and experience, I am confident that I would be a valuable addition to your team.",
+        "My professional experience has equipped me with the skills and knowledge necessary to excel in this role. I am particularly drawn to this opportunity because it aligns perfectly with my career goals and allows me to contribute to your organization's continued success.",
+        "I would welcome the opportunity to discuss how my qualifications can benefit your team. Thank you for considering my application, and I look forward to hearing from you soon."
+    )
+
+@lru_cache(maxsize=8)
+def _format_date(ordinal: int) -> str:
+    """Cover letter date line, formatted once per day"""
+    return date.fromordinal(ordinal).strftime("%B %d, %Y")
+
+# Education and skills blocks are often identical across the tailored
+# variants of one resume, so they are cached on a frozen copy of their input.
+@lru_cache(maxsize=256)
+def _education_html(education: Tuple[Tuple[Tuple[str, Any], ...], ...]) -> str:
+    parts = ['<div class="section"><div class="section-title">Education</div>']
+    
+    for edu in map(dict, education):
+        # Format date range
+        start_date = edu.get('start_date', '')
+        end_date = edu.get('end_date', '')
+        date_range = f"{start_date} - {end_date}" if start_date and end_date else end_date
+    
+        # Additional details
+        gpa = edu.get('gpa', '')
+        honors = edu.get('honors', '')
+        details = []
+        if gpa:
+            details.append(f"GPA: {gpa}")
+        if honors:
+            details.append(honors)
+    
+        details_html = f"<div class='description'>{', '.join(details)}</div>" if details else ""
+    
+        parts.append(f"""
+        <div class="education-item no-break">
+            <div class="degree">{edu.get('degree', '')}</div>
+            <div class="institution">{edu.get('institution', '')}</div>
+            <div class="date-range">{date_range}</div>
+            {details_html}
+        </div>
+        """)
+    
+    parts.append('</div>')
+    return "".join(parts)
+
+@lru_cache(maxsize=256)
+def _skills_html(skills: Tuple[Tuple[str, Tuple[str, ...]], ...], style: ResumeStyle) -> str:
+    opening, item, closing = _SKILLS_LAYOUTS[style]
+    body = "".join(
+        item.format(category=category, skills=", ".join(skill_list))
+        for category, skill_list in skills
+    )
+    return f'<div class="section"><div class="section-title">Skills</div>{opening}{body}{closing}</div>'
+
+class ChunkedSink(io.RawIOBase):
+    """
+    Write-only buffer kept as a list of preallocated 64 KB blocks. Writes of
+    any size are copied once into the blocks, so a growing PDF is never
+    reallocated and copied into one ever larger buffer.
+    """
+    CHUNK_SIZE = 64 * 1024
+    # Idle sinks kept for reuse across renders in this process, each holding
+    # on to at most POOLED_BLOCKS of its blocks (256 KB covers a typical PDF)
+    POOL_SIZE = 16
+    POOLED_BLOCKS = 4
+    _pool: "queue.LifoQueue[ChunkedSink]" = queue.LifoQueue(maxsize=POOL_SIZE)
+    
+    @classmethod
+    def acquire(cls) -> "ChunkedSink":
+        """An empty sink from the pool, or a new one when the pool is empty"""
+        try:
+            return cls._pool.get_nowait()
+        except queue.Empty:
+            return cls()
+    
+    def release(self) -> None:
+        """Empty the sink, keeping its blocks, and return it to the pool; don't touch it afterwards"""
+        if self.closed:
+            return
+        del self._blocks[self.POOLED_BLOCKS:]
+        self._used = 0
+        self._pos = self.CHUNK_SIZE
+        self._size = 0
+        try:
+            self._pool.put_nowait(self)
+        except queue.Full:
+            pass
+    
     def __init__(self):
-        self.resume_templates = {
-            "modern": self._get_modern_resume_template(),
-            "classic": self._get_classic_resume_template(),
-            "creative": self._get_creative_resume_template(),
-            "minimal": self._get_minimal_resume_template()
-        }
+        super().__init__()
+        # The first _used blocks hold data (all full but the last, which is
+        # filled up to _pos); blocks past them are spares kept from a reuse
+        self._blocks: List[bytearray] = []
+        self._used = 0
+        self._pos = self.CHUNK_SIZE
+        self._size = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, b) -> int:
+        data = memoryview(b).cast("B")
+        n = len(data)
+        offset = 0
+        while offset < n:
+            if self._pos == self.CHUNK_SIZE:
+                if self._used == len(self._blocks):
+                    self._blocks.append(bytearray(self.CHUNK_SIZE))
+                self._used += 1
+                self._pos = 0
+            take = min(self.CHUNK_SIZE - self._pos, n - offset)
+            self._blocks[self._used - 1][self._pos:self._pos + take] = data[offset:offset + take]
+            self._pos += take
+            offset += take
+        self._size += n
+        return n
+    
+    def tell(self) -> int:
+        return self._size
+    
+    def iter_chunks(self) -> Iterator[memoryview]:
+        """
+        Yield views of the written data block by block (e.g. for a
+        StreamingResponse); they are only valid until the sink is reused.
+        """
+        last = self._used - 1
+        for i in range(self._used):
+            block = memoryview(self._blocks[i])
+            yield block[:self._pos] if i == last else block
+    
+    def getvalue(self) -> bytes:
+        """All written data, copied out once"""
+        return b"".join(self.iter_chunks())
+
+class PDFGenerator:
+    # Seconds between real render probes behind health_check
+    HEALTH_RECHECK_SECONDS = 300
+    
+    # Compiled templates are shared by every instance in the process. They are
+    # keyed by (style, backend) because the backend decides CSS inlining and
+    # gradient flattening.
+    _compiled_resume: Dict[Tuple[ResumeStyle, str], ChunkTemplate] = {}
+    _compiled_cover_letter: Dict[Tuple[CoverLetterStyle, str], ChunkTemplate] = {}
+    
+    # Worker processes shared by every instance, started on the first async
+    # render; see _worker_init
+    _pool: Optional[ProcessPoolExecutor] = None
+    # Caps in-flight async renders at the worker count, so a burst waits here
+    # instead of piling up in the pool's queue
+    _render_slots: Optional[asyncio.Semaphore] = None
+    
+    def __init__(self, cache_bytes: int = PDF_CACHE_BYTES):
+        # Template sources are built and compiled on first use of each style;
+        # both tuples are indexed by ResumeStyle / CoverLetterStyle
+        self._resume_builders = (
+            self._get_modern_resume_template,
+            self._get_classic_resume_template,
+            self._get_creative_resume_template,
+            self._get_minimal_resume_template
+        )
         
-        self.cover_letter_templates = {
-            "professional": self._get_professional_cover_letter_template(),
-            "friendly": self._get_friendly_cover_letter_template(),
-            "enthusiastic": self._get_enthusiastic_cover_letter_template(),
-            "formal": self._get_formal_cover_letter_template()
-        }
+        self._cover_letter_builders = (
+            self._get_professional_cover_letter_template,
+            self._get_friendly_cover_letter_template,
+            self._get_enthusiastic_cover_letter_template,
+            self._get_formal_cover_letter_template
+        )
         
         # Base CSS for all templates
         self.base_css = """
@@ -52,16 +448,102 @@ class PDFGenerator:
             .no-break {
                 page-break-inside: avoid;
             }
+            
+            /* Contain the floated date badge without a clearing div per entry */
+            .experience-item, .education-item {
+                display: flow-root;
+            }
+            
+            .experience-item .description, .education-item .description {
+                clear: both;
+            }
         """
+        
+        if PDF_BACKEND not in PDF_BACKENDS:
+            logger.warning(f"Unknown PDF backend {PDF_BACKEND!r}, using xhtml2pdf")
+            self._backend = "xhtml2pdf"
+        elif PDF_BACKEND == "weasyprint" and HTML is None:
+            logger.info(f"PDF backend {PDF_BACKEND} is not available, using xhtml2pdf")
+            self._backend = "xhtml2pdf"
+        else:
+            self._backend = PDF_BACKEND
+        
+        # WeasyPrint gets the shared CSS as one stylesheet parsed up front;
+        # xhtml2pdf needs it inlined into every template.
+        self._base_stylesheet = _parsed_css(self.base_css) if self._backend == "weasyprint" else None
+        self._inline_css = "" if self._base_stylesheet is not None else self.base_css
+        self._flat = self._backend == "xhtml2pdf"
+        
+        # WeasyPrint stylesheets per (template type, style), holding only the
+        # base rules that template can match; parsed once on first use
+        self._stylesheets: Dict[Tuple[str, int], Any] = {}
+        
+        # Finished PDFs keyed by template, style, date and a hash of the content,
+        # so re-submitting an unchanged form skips layout entirely. Pool workers
+        # run without one; generate_pdf_async checks this cache before submitting.
+        self._pdf_cache: Optional[LRUCache] = (
+            LRUCache(maxsize=cache_bytes, getsizeof=len) if cache_bytes > 0 else None
+        )
+        # LRUCache reorders entries on every read, and generate_pdf runs on
+        # worker threads
+        self._pdf_cache_lock = threading.Lock()
+        
+        # Output directories save_pdf_to_file has already created
+        self._known_dirs: set = set()
+        
+        # Probe the backend once now; health_check serves the cached result
+        self._healthy = self._probe()
+        self._last_checked = time.monotonic()
+    
+    def render(self, name: str, ctx: Dict[str, Any]) -> str:
+        """Fill the compiled resume or cover letter template `name` with ctx"""
+        if name.upper() in ResumeStyle.__members__:
+            template = self._resume_template(ResumeStyle[name.upper()])
+        else:
+            template = self._cover_letter_template(CoverLetterStyle[name.upper()])
+        return template.safe_substitute(ctx)
+    
+    def _resume_template(self, style: ResumeStyle) -> ChunkTemplate:
+        key = (style, self._backend)
+        template = self._compiled_resume.get(key)
+        if template is None:
+            source = self._resume_builders[style]()
+            template = self._compiled_resume[key] = _compile_template(source, self._inline_css, self._flat)
+        return template
+    
+    def _cover_letter_template(self, style: CoverLetterStyle) -> ChunkTemplate:
+        key = (style, self._backend)
+        template = self._compiled_cover_letter.get(key)
+        if template is None:
+            source = self._cover_letter_builders[style]()
+            template = self._compiled_cover_letter[key] = _compile_template(source, self._inline_css, self._flat)
+        return template
+    
+    def _stylesheet(self, template_type: str, style: int):
+        key = (template_type, int(style))
+        sheet = self._stylesheets.get(key)
+        if sheet is None:
+            if template_type == "resume":
+                used = _markup_classes(self._resume_builders[style]()) | _RESUME_SECTION_CLASSES
+            else:
+                used = _markup_classes(self._cover_letter_builders[style]())
+            sheet = self._stylesheets[key] = _parsed_css(_curate_css(self.base_css, used))
+        return sheet
     
     def health_check(self) -> bool:
-        """Check if PDF generator is working properly"""
+        """Check if PDF generator is working properly (re-probed every HEALTH_RECHECK_SECONDS)"""
+        now = time.monotonic()
+        if now - self._last_checked >= self.HEALTH_RECHECK_SECONDS:
+            self._healthy = self._probe()
+            self._last_checked = now
+        return self._healthy
+    
+    def _probe(self) -> bool:
+        """Render a tiny document with the active backend"""
         try:
             # Test basic PDF generation
             test_html = "<html><body><h1>Test</h1></body></html>"
-            result = io.BytesIO()
-            pisa_status = pisa.pisaDocument(io.StringIO(test_html), dest=result)
-            return not pisa_status.err
+            return bool(self._render_pdf(test_html))
         except Exception as e:
             logger.error(f"PDF generator health check failed: {str(e)}")
             return False
@@ -74,11 +556,7 @@ class PDFGenerator:
             <meta charset="UTF-8">
             <style>
                 {base_css}
-                
-                .container {
-                    max-width: 100%;
-                    margin: 0 auto;
-                }
+                {common_resume_css}
                 
                 .header {
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -111,13 +589,10 @@ class PDFGenerator:
                 
                 .section-title {
                     font-size: 14pt;
-                    font-weight: bold;
                     color: #667eea;
                     border-bottom: 2px solid #667eea;
                     padding-bottom: 5px;
                     margin-bottom: 15px;
-                    text-transform: uppercase;
-                    letter-spacing: 1px;
                 }
                 
                 .summary {
@@ -146,9 +621,6 @@ class PDFGenerator:
                 }
                 
                 .date-range {
-                    font-size: 9pt;
-                    color: #888;
-                    float: right;
                     font-style: italic;
                 }
                 
@@ -222,10 +694,9 @@ class PDFGenerator:
             <meta charset="UTF-8">
             <style>
                 {base_css}
+                {common_resume_css}
                 
                 .container {
-                    max-width: 100%;
-                    margin: 0 auto;
                     padding: 20px;
                 }
                 
@@ -254,10 +725,7 @@ class PDFGenerator:
                 
                 .section-title {
                     font-size: 12pt;
-                    font-weight: bold;
                     color: #333;
-                    text-transform: uppercase;
-                    letter-spacing: 1px;
                     margin-bottom: 15px;
                     border-bottom: 1px solid #ccc;
                     padding-bottom: 5px;
@@ -299,12 +767,6 @@ class PDFGenerator:
                     font-style: italic;
                 }
                 
-                .date-range {
-                    font-size: 9pt;
-                    color: #888;
-                    float: right;
-                }
-                
                 .description {
                     margin-top: 8px;
                     font-size: 10pt;
@@ -350,14 +812,13 @@ class PDFGenerator:
             <meta charset="UTF-8">
             <style>
                 {base_css}
+                {common_resume_css}
                 
                 body {
                     background: linear-gradient(45deg, #f0f2f5 0%, #ffffff 100%);
                 }
                 
                 .container {
-                    max-width: 100%;
-                    margin: 0 auto;
                     background: white;
                     box-shadow: 0 0 20px rgba(0,0,0,0.1);
                 }
@@ -402,21 +863,15 @@ class PDFGenerator:
                 
                 .sidebar .section-title {
                     font-size: 11pt;
-                    font-weight: bold;
                     margin-bottom: 15px;
                     padding-bottom: 8px;
                     border-bottom: 2px solid rgba(255,255,255,0.3);
-                    text-transform: uppercase;
-                    letter-spacing: 1px;
                 }
                 
                 .main-content .section-title {
                     font-size: 14pt;
-                    font-weight: bold;
                     color: #ff6b6b;
                     margin-bottom: 20px;
-                    text-transform: uppercase;
-                    letter-spacing: 1px;
                 }
                 
                 .skill-item {
@@ -445,9 +900,6 @@ class PDFGenerator:
                 }
                 
                 .date-range {
-                    font-size: 9pt;
-                    color: #888;
-                    float: right;
                     background: #fff;
                     padding: 2px 8px;
                     border-radius: 12px;
@@ -498,6 +950,7 @@ class PDFGenerator:
             <meta charset="UTF-8">
             <style>
                 {base_css}
+                {common_resume_css}
                 
                 body {
                     font-family: 'Helvetica Neue', Arial, sans-serif;
@@ -505,8 +958,6 @@ class PDFGenerator:
                 }
                 
                 .container {
-                    max-width: 100%;
-                    margin: 0 auto;
                     padding: 40px;
                 }
                 
@@ -542,7 +993,6 @@ class PDFGenerator:
                     font-size: 10pt;
                     font-weight: 600;
                     color: #333;
-                    text-transform: uppercase;
                     letter-spacing: 2px;
                     margin-bottom: 20px;
                     border-bottom: 1px solid #eee;
@@ -573,9 +1023,7 @@ class PDFGenerator:
                 }
                 
                 .date-range {
-                    font-size: 9pt;
                     color: #bbb;
-                    float: right;
                 }
                 
                 .description {
@@ -1048,63 +1496,127 @@ class PDFGenerator:
         """
     
     async def generate_pdf_async(self, content: str, template_type: str, style: str = "modern") -> bytes:
-        """Generate PDF asynchronously"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate_pdf, content, template_type, style)
+        """Generate PDF asynchronously in a worker process (layout is CPU-bound and holds the GIL)"""
+        style = _template_style(template_type, style)
+        key = self._pdf_cache_key(content, template_type, style) if self._pdf_cache is not None else None
+        cached = self._cached_pdf(key)
+        if cached is not None:
+            return cached
+        
+        cls = type(self)
+        if cls._pool is None:
+            cls._pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, initializer=_worker_init)
+            cls._render_slots = asyncio.Semaphore(PDF_WORKERS)
+        loop = asyncio.get_running_loop()
+        async with cls._render_slots:
+            pdf_bytes = await loop.run_in_executor(cls._pool, _generate_in_worker, content, template_type, style)
+        self._store_pdf(key, pdf_bytes)
+        return pdf_bytes
+    
+    def close(self):
+        """Shut down the shared worker processes"""
+        cls = type(self)
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=True)
+            cls._pool = None
+            cls._render_slots = None
     
     def generate_pdf(self, content: Dict[str, Any], template_type: str, style: str = "modern") -> bytes:
         """Generate PDF with enhanced templates and error handling"""
         try:
+            style = _template_style(template_type, style)
+            key = self._pdf_cache_key(content, template_type, style) if self._pdf_cache is not None else None
+            cached = self._cached_pdf(key)
+            if cached is not None:
+                return cached
+            
+            # Escape all user text once up front; the section builders and
+            # template fields then interpolate it as-is
+            content = _walk_escape(content)
             if template_type == "resume":
                 html = self._generate_resume_html(content, style)
-            elif template_type == "cover_letter":
-                html = self._generate_cover_letter_html(content, style)
             else:
-                raise ValueError(f"Unknown template type: {template_type}")
+                html = self._generate_cover_letter_html(content, style)
             
             # Generate PDF
-            result = io.BytesIO()
-            pisa_status = pisa.pisaDocument(io.StringIO(html), dest=result)
+            stylesheet = self._stylesheet(template_type, style) if self._base_stylesheet is not None else None
+            pdf_bytes = self._render_pdf(html, stylesheet)
+            self._store_pdf(key, pdf_bytes)
+            return pdf_bytes
+            
+        except Exception as e:
+            logger.error(f"Error generating PDF: {str(e)}")
+            raise
+    
+    def _cached_pdf(self, key: Optional[tuple]) -> Optional[bytes]:
+        if key is None:
+            return None
+        with self._pdf_cache_lock:
+            return self._pdf_cache.get(key)
+    
+    def _store_pdf(self, key: Optional[tuple], pdf_bytes: bytes) -> None:
+        if key is not None and len(pdf_bytes) <= self._pdf_cache.maxsize:
+            with self._pdf_cache_lock:
+                self._pdf_cache[key] = pdf_bytes
+    
+    @staticmethod
+    def _pdf_cache_key(content: Dict[str, Any], template_type: str, style: int) -> tuple:
+        # Cover letters print today's date, so the day is part of the key
+        digest = hashlib.blake2b(
+            orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+            digest_size=16
+        ).digest()
+        return template_type, int(style), date.today().toordinal(), digest
+    
+    def _render_pdf(self, html: str, stylesheet=None) -> bytes:
+        """Lay out html with the configured backend (stylesheet defaults to the full base CSS)"""
+        sink = ChunkedSink.acquire()
+        try:
+            if self._backend == "weasyprint":
+                HTML(string=html).write_pdf(target=sink, stylesheets=[stylesheet or self._base_stylesheet])
+                return sink.getvalue()
+            
+            # Hand pisa UTF-8 bytes so its parser doesn't transcode the text again
+            pisa_status = pisa.pisaDocument(io.BytesIO(html.encode("utf-8")), dest=sink, encoding="utf-8")
             
             if pisa_status.err:
                 logger.error(f"PDF generation failed with errors: {pisa_status.err}")
                 raise Exception("PDF generation failed")
             
-            result.seek(0)
-            return result.getvalue()
-            
-        except Exception as e:
-            logger.error(f"Error generating PDF: {str(e)}")
-            raise
+            return sink.getvalue()
+        finally:
+            sink.release()
     
-    def _generate_resume_html(self, content: Dict[str, Any], style: str) -> str:
+    def _generate_resume_html(self, content: Dict[str, Any], style: Union[str, ResumeStyle]) -> str:
         """Generate HTML for resume using specified style"""
-        template = self.resume_templates.get(style, self.resume_templates["modern"])
+        style = _resume_style(style)
+        template = self._resume_template(style)
+        get = content.get
+        phone, address = get('phone', ''), get('address', '')
         
         # Prepare contact information displays
-        phone_display = f"<span>{content.get('phone', '')}</span>" if content.get('phone') else ""
-        address_display = f"<span>{content.get('address', '')}</span>" if content.get('address') else ""
-        linkedin_display = f"<span>{content.get('linkedin', '')}</span>" if content.get('linkedin') else ""
-        github_display = f"<span>{content.get('github', '')}</span>" if content.get('github') else ""
+        phone_display = _fmt_contact(phone or '')
+        address_display = _fmt_contact(address or '')
+        linkedin_display = _fmt_contact(get('linkedin') or '')
+        github_display = _fmt_contact(get('github') or '')
         
         # Generate sections
-        summary_section = self._generate_summary_section(content.get('summary', ''))
-        experience_section = self._generate_experience_section(content.get('experience', []))
-        education_section = self._generate_education_section(content.get('education', []))
-        skills_section = self._generate_skills_section(content.get('skills', {}), style)
+        summary_section = self._generate_summary_section(get('summary', ''))
+        experience_section = self._generate_experience_section(_normalize_experience(get('experience', [])))
+        education_section = self._generate_education_section(get('education', []))
+        skills_section = self._generate_skills_section(_normalize_skills(get('skills', {})), style)
         
-        # Format the template
-        html = template.format(
-            base_css=self.base_css,
-            full_name=content.get('full_name', ''),
-            email=content.get('email', ''),
-            phone=content.get('phone', ''),
-            address=content.get('address', ''),
+        # Fill the template
+        html = template.render(
+            full_name=get('full_name', ''),
+            email=get('email', ''),
+            phone=phone,
+            address=address,
             phone_display=phone_display,
             address_display=address_display,
             linkedin_display=linkedin_display,
             github_display=github_display,
-            job_target=content.get('job_target', ''),
+            job_target=get('job_target', ''),
             summary_section=summary_section,
             experience_section=experience_section,
             education_section=education_section,
@@ -1113,16 +1625,14 @@ class PDFGenerator:
         
         return html
     
-    def _generate_cover_letter_html(self, content: Dict[str, Any], style: str) -> str:
+    def _generate_cover_letter_html(self, content: Dict[str, Any], style: Union[str, CoverLetterStyle]) -> str:
         """Generate HTML for cover letter using specified style"""
-        template = self.cover_letter_templates.get(style, self.cover_letter_templates["professional"])
+        template = self._cover_letter_template(_cover_letter_style(style))
+        get = content.get
         
         # Prepare hiring manager display
-        hiring_manager = content.get('hiring_manager', '')
-        if hiring_manager:
-            hiring_manager_display = f"{hiring_manager}<br>"
-        else:
-            hiring_manager_display = "Hiring Manager<br>"
+        hiring_manager = get('hiring_manager', '')
+        hiring_manager_display = _fmt_hiring_manager(hiring_manager or '')
         
         # Prepare salutation
         if hiring_manager and hiring_manager != "Hiring Manager":
@@ -1131,22 +1641,21 @@ class PDFGenerator:
             salutation = "Hiring Manager"
         
         # Format date
-        current_date = datetime.now().strftime("%B %d, %Y")
+        current_date = _format_date(date.today().toordinal())
         
         # Generate content paragraphs
         content_paragraphs = self._generate_cover_letter_content(content)
         
-        # Format the template
-        html = template.format(
-            base_css=self.base_css,
-            full_name=content.get('full_name', ''),
-            email=content.get('email', ''),
-            phone=content.get('phone', ''),
-            address=content.get('address', ''),
+        # Fill the template
+        html = template.render(
+            full_name=get('full_name', ''),
+            email=get('email', ''),
+            phone=get('phone', ''),
+            address=get('address', ''),
             date=current_date,
             hiring_manager_display=hiring_manager_display,
-            company_name=content.get('company_name', ''),
-            position=content.get('position', ''),
+            company_name=get('company_name', ''),
+            position=get('position', ''),
             salutation=salutation,
             content=content_paragraphs
         )
@@ -1170,7 +1679,7 @@ class PDFGenerator:
         if not experiences:
             return ""
         
-        html = '<div class="section"><div class="section-title">Professional Experience</div>'
+        parts = ['<div class="section"><div class="section-title">Professional Experience</div>']
         
         for exp in experiences:
             # Format date range
@@ -1178,145 +1687,53 @@ class PDFGenerator:
             end_date = exp.get('end_date', 'Present')
             date_range = f"{start_date} - {end_date}" if start_date else ""
             
-            # Format description
-            description = exp.get('description', '')
-            if isinstance(description, list):
-                desc_html = "<ul>"
-                for item in description:
-                    desc_html += f"<li>{item}</li>"
-                desc_html += "</ul>"
-            else:
-                desc_html = f"<p>{description}</p>"
+            # Descriptions are normalized to lists before rendering
+            desc_html = "<ul>" + "".join(f"<li>{item}</li>" for item in exp['description']) + "</ul>"
             
-            html += f"""
+            parts.append(f"""
             <div class="experience-item no-break">
                 <div class="job-title">{exp.get('title', '')}</div>
                 <div class="company">{exp.get('company', '')}</div>
                 <div class="date-range">{date_range}</div>
-                <div style="clear: both;"></div>
                 <div class="description">{desc_html}</div>
             </div>
-            """
+            """)
         
-        html += '</div>'
-        return html
+        parts.append('</div>')
+        return "".join(parts)
     
     def _generate_education_section(self, education: list) -> str:
-        """Generate education section HTML"""
+        """Generate education section HTML (memoized on the entries)"""
         if not education:
             return ""
-        
-        html = '<div class="section"><div class="section-title">Education</div>'
-        
-        for edu in education:
-            # Format date range
-            start_date = edu.get('start_date', '')
-            end_date = edu.get('end_date', '')
-            date_range = f"{start_date} - {end_date}" if start_date and end_date else end_date
-            
-            # Additional details
-            gpa = edu.get('gpa', '')
-            honors = edu.get('honors', '')
-            details = []
-            if gpa:
-                details.append(f"GPA: {gpa}")
-            if honors:
-                details.append(honors)
-            
-            details_html = f"<div class='description'>{', '.join(details)}</div>" if details else ""
-            
-            html += f"""
-            <div class="education-item no-break">
-                <div class="degree">{edu.get('degree', '')}</div>
-                <div class="institution">{edu.get('institution', '')}</div>
-                <div class="date-range">{date_range}</div>
-                <div style="clear: both;"></div>
-                {details_html}
-            </div>
-            """
-        
-        html += '</div>'
-        return html
+        try:
+            return _education_html(tuple(tuple(sorted(edu.items())) for edu in education))
+        except TypeError:
+            # An entry holds an unhashable value; render it uncached
+            return _education_html.__wrapped__(tuple(tuple(edu.items()) for edu in education))
     
-    def _generate_skills_section(self, skills: dict, style: str) -> str:
-        """Generate skills section HTML based on style"""
+    def _generate_skills_section(self, skills: dict, style: ResumeStyle) -> str:
+        """Generate skills section HTML based on style (memoized on the skill groups)"""
         if not skills:
             return ""
-        
-        html = '<div class="section"><div class="section-title">Skills</div>'
-        
-        if style == "modern":
-            html += '<div class="skills-grid">'
-            for category, skill_list in skills.items():
-                if isinstance(skill_list, list):
-                    skills_text = ", ".join(skill_list)
-                else:
-                    skills_text = str(skill_list)
-                
-                html += f"""
-                <div class="skill-category">
-                    <h4>{category}</h4>
-                    <div class="skill-list">{skills_text}</div>
-                </div>
-                """
-            html += '</div>'
-            
-        elif style == "creative":
-            for category, skill_list in skills.items():
-                if isinstance(skill_list, list):
-                    skills_text = ", ".join(skill_list)
-                else:
-                    skills_text = str(skill_list)
-                
-                html += f"""
-                <div class="section-title">{category}</div>
-                <div class="skill-item">{skills_text}</div>
-                """
-                
-        else:  # classic, minimal
-            if style == "minimal":
-                html += '<div class="skills-simple">'
-            else:
-                html += '<div class="skills-list">'
-            
-            for category, skill_list in skills.items():
-                if isinstance(skill_list, list):
-                    skills_text = ", ".join(skill_list)
-                else:
-                    skills_text = str(skill_list)
-                
-                html += f"<strong>{category}:</strong> {skills_text}<br>"
-            
-            html += '</div>'
-        
-        html += '</div>'
-        return html
+        return _skills_html(tuple((category, tuple(skill_list)) for category, skill_list in skills.items()), style)
     
     def _generate_cover_letter_content(self, content: Dict[str, Any]) -> str:
         """Generate cover letter content paragraphs"""
-        paragraphs = content.get('paragraphs', [])
-        
+        paragraphs = content.get('paragraphs')
         if not paragraphs:
             # Generate default content if none provided
-            company_name = content.get('company_name', '[Company Name]')
-            position = content.get('position', '[Position]')
-            
-            paragraphs = [
-                f"I am writing to express my strong interest in the {position} position at {company_name}. With my background and experience, I am confident that I would be a valuable addition to your team.",
-                "My professional experience has equipped me with the skills and knowledge necessary to excel in this role. I am particularly drawn to this opportunity because it aligns perfectly with my career goals and allows me to contribute to your organization's continued success.",
-                "I would welcome the opportunity to discuss how my qualifications can benefit your team. Thank you for considering my application, and I look forward to hearing from you soon."
-            ]
+            paragraphs = _default_paragraphs(
+                content.get('company_name', '[Company Name]'), content.get('position', '[Position]')
+            )
         
-        html = ""
-        for paragraph in paragraphs:
-            html += f"<p>{paragraph}</p>"
-        
-        return html
+        # Blank lines inside a paragraph start a new one
+        return ("<p>" + "</p><p>".join(map(str, paragraphs)) + "</p>").replace("\n\n", "</p><p>")
     
     def generate_pdf_base64(self, content: Dict[str, Any], template_type: str, style: str = "modern") -> str:
         """Generate PDF and return as base64 string"""
         pdf_bytes = self.generate_pdf(content, template_type, style)
-        return base64.b64encode(pdf_bytes).decode('utf-8')
+        return binascii.b2a_base64(pdf_bytes, newline=False).decode('ascii')
     
     def save_pdf_to_file(self, content: Dict[str, Any], template_type: str, 
                         output_path: str, style: str = "modern") -> bool:
@@ -1324,11 +1741,21 @@ class PDFGenerator:
         try:
             pdf_bytes = self.generate_pdf(content, template_type, style)
             
-            # Ensure directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            # Ensure directory exists; batch saves mostly target one folder
+            parent = os.path.dirname(output_path)
+            if parent and parent not in self._known_dirs:
+                os.makedirs(parent, exist_ok=True)
+                self._known_dirs.add(parent)
             
-            with open(output_path, 'wb') as f:
-                f.write(pdf_bytes)
+            # Unbuffered write straight from the PDF bytes; os.write may
+            # write less than asked, so loop over the remainder
+            fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(pdf_bytes)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
             
             logger.info(f"PDF saved successfully to {output_path}")
             return True
@@ -1340,8 +1767,8 @@ class PDFGenerator:
     def get_available_templates(self) -> Dict[str, list]:
         """Get list of available templates"""
         return {
-            "resume": list(self.resume_templates.keys()),
-            "cover_letter": list(self.cover_letter_templates.keys())
+            "resume": [style.name.lower() for style in ResumeStyle],
+            "cover_letter": [style.name.lower() for style in CoverLetterStyle]
         }
     
     def validate_content(self, content: Dict[str, Any], template_type: str) -> Dict[str, Any]:
@@ -1362,9 +1789,9 @@ class PDFGenerator:
             validated['summary'] = content.get('summary', '').strip()
             
             # Lists
-            validated['experience'] = content.get('experience', [])
+            validated['experience'] = _normalize_experience(content.get('experience', []))
             validated['education'] = content.get('education', [])
-            validated['skills'] = content.get('skills', {})
+            validated['skills'] = _normalize_skills(content.get('skills', {}))
             
         elif template_type == "cover_letter":
             # Required fields for cover letter
@@ -1381,6 +1808,17 @@ class PDFGenerator:
         
         return validated
 
+# Process pool workers each build one generator in the initializer; jobs then only carry the content dict and style.
+# Workers keep no PDF cache of their own: the parent checks and fills its cache around every job.
+_worker_generator: Optional[PDFGenerator] = None
+
+def _worker_init() -> None:
+    global _worker_generator
+    _worker_generator = PDFGenerator(cache_bytes=0)
+
+def _generate_in_worker(content: Dict[str, Any], template_type: str, style: Union[str, int]) -> bytes:
+    return _worker_generator.generate_pdf(content, template_type, style)
+
 # Example usage and testing
 if __name__ == "__main__":
     # Example resume data